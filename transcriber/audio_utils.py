@@ -1,72 +1,96 @@
-import os
-import shlex
-import subprocess
-import tempfile
 from dataclasses import dataclass
-from typing import Literal, Optional
+from typing import List, Literal
+
+import av
+import numpy as np
 
 
 @dataclass
 class SplitResult:
-    left_wav_path: str
-    right_wav_path: str
-    temp_dir: str
+    left_audio: np.ndarray
+    right_audio: np.ndarray
+    sample_rate: int
 
 
-def ensure_ffmpeg_available() -> None:
-    try:
-        subprocess.run(["ffmpeg", "-version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-    except Exception as exc:
-        raise RuntimeError(
-            "ffmpeg is required but not found on PATH. Install it (e.g., brew install ffmpeg)."
-        ) from exc
+_NORMALIZER_FILTERS = {
+    # EBU R128 normalization (targets voice-friendly loudness). Needs long look-ahead
+    # buffering and heavy per-sample work; only worth it for broadcast-grade output.
+    "loudnorm": ",loudnorm=I=-16:TP=-1.5:LRA=11:print_format=none",
+    # Streaming dynamic normalizer to smooth out varying levels (short window keeps it cheap)
+    "dynaudnorm": ",dynaudnorm=f=150:g=15:m=15:s=10",
+    "none": "",
+}
+
+# Every (channel, normalizer) chain, built once at import
+_FILTERS = {
+    (channel, normalizer): f"pan=mono|c0={channel}{suffix}"
+    for channel in ("FL", "FR")
+    for normalizer, suffix in _NORMALIZER_FILTERS.items()
+}
 
 
 def _build_filter(channel: Literal["FL", "FR"], normalizer: Literal["loudnorm", "dynaudnorm", "none"]) -> str:
-    base = f"pan=mono|c0={channel}"
-    if normalizer == "loudnorm":
-        # EBU R128 single-pass normalization (targets voice-friendly loudness)
-        return f"{base},loudnorm=I=-16:TP=-1.5:LRA=11:print_format=none"
-    if normalizer == "dynaudnorm":
-        # Dynamic normalizer to smooth out varying levels
-        return f"{base},dynaudnorm=f=200:g=31:m=15:s=10"
-    return base
+    return _FILTERS[(channel, normalizer)]
+
+
+def _build_graph(stream: av.audio.stream.AudioStream, chain: str) -> av.filter.Graph:
+    # Link an ffmpeg-style "name=args,name=args" chain between a buffer source and sink
+    graph = av.filter.Graph()
+    node = graph.add_abuffer(template=stream)
+    for part in chain.split(","):
+        name, _, args = part.partition("=")
+        nxt = graph.add(name, args or None)
+        node.link_to(nxt)
+        node = nxt
+    node.link_to(graph.add("abuffersink"))
+    graph.configure()
+    return graph
+
+
+def _drain(graph: av.filter.Graph, chunks: List[np.ndarray]) -> None:
+    while True:
+        try:
+            frame = graph.pull()
+        except (av.error.BlockingIOError, av.error.EOFError):
+            return
+        chunks.append(frame.to_ndarray()[0])
 
 
 def split_stereo_to_mono(
     input_path: str,
     sample_rate: int = 16000,
-    normalizer: Literal["loudnorm", "dynaudnorm", "none"] = "loudnorm",
+    normalizer: Literal["loudnorm", "dynaudnorm", "none"] = "dynaudnorm",
 ) -> SplitResult:
     """
-    Split a stereo file into two mono PCM WAVs at a given sample rate using the pan filter,
-    and optionally normalize loudness per channel.
+    Split a stereo file into two mono float32 arrays at a given sample rate using the pan filter,
+    and optionally normalize loudness per channel. The input is decoded once in-process with PyAV
+    and every frame is fed through one filter graph per channel, so no ffmpeg subprocess or
+    temp files are involved.
 
-    Returns paths to left and right channel wavs and the temp dir (caller should clean up).
+    Returns the left and right channel samples and their sample rate.
     """
-    ensure_ffmpeg_available()
-
-    temp_dir = tempfile.mkdtemp(prefix="callsplit_")
-    left_path = os.path.join(temp_dir, "left.wav")
-    right_path = os.path.join(temp_dir, "right.wav")
-
-    filt_left = _build_filter("FL", normalizer)
-    filt_right = _build_filter("FR", normalizer)
-
-    cmd_left = (
-        f"ffmpeg -y -i {shlex.quote(input_path)} "
-        f"-filter:a \"{filt_left}\" -ar {sample_rate} -c:a pcm_s16le {shlex.quote(left_path)}"
-    )
-    cmd_right = (
-        f"ffmpeg -y -i {shlex.quote(input_path)} "
-        f"-filter:a \"{filt_right}\" -ar {sample_rate} -c:a pcm_s16le {shlex.quote(right_path)}"
-    )
-
-    for cmd in (cmd_left, cmd_right):
-        proc = subprocess.run(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        if proc.returncode != 0:
-            raise RuntimeError(
-                f"ffmpeg error while splitting channels. Command: {cmd}\nSTDERR:\n{proc.stderr.decode('utf-8', errors='ignore')}"
-            )
-
-    return SplitResult(left_wav_path=left_path, right_wav_path=right_path, temp_dir=temp_dir)
+    try:
+        with av.open(input_path) as container:
+            stream = container.streams.audio[0]
+            # Same as ffmpeg's -threads 0: let libavcodec pick frame/slice threading and thread count
+            stream.thread_type = "AUTO"
+            stream.codec_context.thread_count = 0
+            graphs = []
+            for channel in ("FL", "FR"):
+                chain = f"{_build_filter(channel, normalizer)},aresample={sample_rate},aformat=sample_fmts=flt:channel_layouts=mono"
+                graphs.append((_build_graph(stream, chain), []))
+
+            for frame in container.decode(stream):
+                for graph, chunks in graphs:
+                    graph.push(frame)
+                    _drain(graph, chunks)
+
+            # Flush anything the filters are still holding (loudnorm buffers ahead)
+            for graph, chunks in graphs:
+                graph.push(None)
+                _drain(graph, chunks)
+    except av.error.FFmpegError as exc:
+        raise RuntimeError(f"Failed to split channels of {input_path}: {exc}") from exc
+
+    left, right = (np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32) for _, chunks in graphs)
+    return SplitResult(left_audio=left, right_audio=right, sample_rate=sample_rate)
@@ -1,18 +1,28 @@
 from __future__ import annotations
 
 import os
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
 
 from .whisper_utils import TranscriptSegment
 
 
-def _fmt_time(seconds: float) -> str:
-    if seconds < 0:
-        seconds = 0.0
-    minutes = int(seconds // 60)
-    secs = seconds - minutes * 60
-    centis = int(round((secs - int(secs)) * 100))
-    return f"[{minutes:02d}:{int(secs):02d}.{centis:02d}]"
+def _fmt_times(seconds: Sequence[float]) -> List[str]:
+    # Compute minute/second/centisecond fields for all timestamps at once
+    starts = np.maximum(np.fromiter(seconds, dtype=np.float64, count=len(seconds)), 0.0)
+    minutes = starts // 60
+    secs = starts - minutes * 60
+    whole = np.trunc(secs)
+    centis = np.rint((secs - whole) * 100)
+    return [
+        f"[{m:02d}:{sec:02d}.{c:02d}]"
+        for m, sec, c in zip(
+            minutes.astype(np.int64).tolist(),
+            whole.astype(np.int64).tolist(),
+            centis.astype(np.int64).tolist(),
+        )
+    ]
 
 
 def write_lrc(
@@ -21,18 +31,15 @@ def write_lrc(
     title: Optional[str] = None,
     artists: Optional[str] = None,
 ) -> None:
-    lines: List[str] = []
-    if title:
-        lines.append(f"[ti:{title}]")
-    if artists:
-        lines.append(f"[ar:{artists}]")
-
-    for seg in segments:
-        ts = _fmt_time(seg.start)
-        speaker = seg.speaker or "Speaker"
-        text = seg.text.strip()
-        lines.append(f"{ts} {speaker}: {text}")
-
     os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines) + "\n")
+    segments = list(segments)
+    timestamps = _fmt_times([seg.start for seg in segments])
+
+    with open(output_path, "w", encoding="utf-8", buffering=1 << 20, newline="\n") as f:
+        if title:
+            f.write(f"[ti:{title}]\n")
+        if artists:
+            f.write(f"[ar:{artists}]\n")
+        f.writelines(
+            f"{ts} {seg.speaker or 'Speaker'}: {seg.text.strip()}\n" for ts, seg in zip(timestamps, segments)
+        )
@@ -2,8 +2,8 @@ from __future__ import annotations
 
 import os
 import re
-import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 import click
@@ -36,10 +36,13 @@ def _parse_other_party_from_filename(path: str) -> Optional[str]:
 @click.option("--model-dir", type=str, default="/models", envvar="WHISPER_MODEL_DIR", help="Directory from which to load whisper models (/models)")
 @click.option("--device", type=click.Choice(["auto", "cpu", "cuda"]), default="auto", envvar="DEVICE")
 @click.option("--compute-type", "compute_type", type=str, default=None, envvar="COMPUTE_TYPE", help="faster-whisper compute type (auto)")
+@click.option("--num-workers", type=int, default=2, envvar="NUM_WORKERS", help="Model workers serving concurrent channel transcriptions (2)")
+@click.option("--cpu-threads", type=int, default=None, envvar="CPU_THREADS", help="CPU threads per model worker (auto)")
+@click.option("--batch-size", type=int, default=8, envvar="BATCH_SIZE", help="Batched inference size (1 disables batching)")
 @click.option("--other-on", type=click.Choice(["left", "right"]), default="left", envvar="OTHER_ON", help="Which channel is the non-you party")
 @click.option("--you-name", type=str, default="You", envvar="YOU_NAME", help="Override name for your channel label")
 @click.option("--other-name", type=str, default=None, envvar="OTHER_NAME", help="Override name parsed from filename for the other party")
-@click.option("--normalize", type=click.Choice(["loudnorm", "dynaudnorm", "none"]), default="loudnorm", envvar="NORMALIZE", help="Per-channel normalization")
+@click.option("--normalize", type=click.Choice(["loudnorm", "dynaudnorm", "none"]), default="dynaudnorm", envvar="NORMALIZE", help="Per-channel normalization (loudnorm is much slower)")
 def main(
     input_path: str,
     output_path: Optional[str],
@@ -47,6 +50,9 @@ def main(
     model_dir: Optional[str],
     device: str,
     compute_type: Optional[str],
+    num_workers: int,
+    cpu_threads: Optional[int],
+    batch_size: int,
     other_on: str,
     you_name: str,
     other_name: Optional[str],
@@ -70,22 +76,26 @@ def main(
     # Map speakers to channels
     if other_on == "left":
         left_label, right_label = other_label, you_name
-        left_path, right_path = split.left_wav_path, split.right_wav_path
+        left_audio, right_audio = split.left_audio, split.right_audio
     else:
         left_label, right_label = you_name, other_label
-        left_path, right_path = split.left_wav_path, split.right_wav_path
+        left_audio, right_audio = split.left_audio, split.right_audio
 
     # Load model
     os.makedirs(model_dir, exist_ok=True)
     click.echo(f"Loading whisper model: {model_size} ({device}) ...")
-    model = load_model(model_size, device=device, compute_type=compute_type, model_dir=model_dir)
-
-    # Transcribe each channel with VAD
-    click.echo(f"Transcribing LEFT channel as '{left_label}' ...")
-    left_segments = transcribe_file(model, left_path)
-
-    click.echo(f"Transcribing RIGHT channel as '{right_label}' ...")
-    right_segments = transcribe_file(model, right_path)
+    model = load_model(
+        model_size, device=device, compute_type=compute_type, model_dir=model_dir,
+        cpu_threads=cpu_threads, num_workers=num_workers,
+    )
+
+    # Transcribe both channels concurrently with VAD (inference releases the GIL).
+    # With two model workers CTranslate2 runs them side by side on the same weights.
+    click.echo(f"Transcribing LEFT channel as '{left_label}' and RIGHT channel as '{right_label}' ...")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        left_segments, right_segments = pool.map(
+            lambda audio: transcribe_file(model, audio, batch_size=batch_size), (left_audio, right_audio)
+        )
 
     # Merge into linear dialog
     click.echo("Merging dialogue and writing LRC...")
@@ -99,13 +109,6 @@ def main(
 
     click.echo(f"Done. Wrote: {output_path}")
 
-    # Cleanup temp dir
-    try:
-        if os.path.isdir(split.temp_dir):
-            shutil.rmtree(split.temp_dir)
-    except Exception:
-        pass
-
 
 if __name__ == "__main__":
     main()
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
+import functools
 import os
 import re
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, replace
-from statistics import mean
-from typing import Iterable, List, Literal, Optional
+from operator import attrgetter
+from typing import Iterable, List, Literal, Optional, Union
 
-from faster_whisper import WhisperModel
+import ctranslate2
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel
 
 
-@dataclass
+@dataclass(slots=True)
 class WordToken:
     start: float
     end: float
@@ -17,7 +21,7 @@ class WordToken:
     probability: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TranscriptSegment:
     start: float
     end: float
@@ -32,23 +36,43 @@ _WORDLIKE = re.compile(r"[\w\-]+", re.UNICODE)
 _BRACKETED = re.compile(r"\s*(\[[^\]]+\]|\([^\)]+\))\s*")
 
 
+@functools.lru_cache(maxsize=4)
+def _load_model_cached(
+    model_size: str,
+    device: str,
+    compute_type: str,
+    model_dir: Optional[str],
+    cpu_threads: int,
+    num_workers: int,
+) -> WhisperModel:
+    return WhisperModel(
+        model_size,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+        num_workers=num_workers,
+        download_root=model_dir,
+    )
+
+
 def load_model(
     model_size: str,
     device: Literal["auto", "cpu", "cuda"] = "auto",
     compute_type: Optional[str] = None,
     model_dir: Optional[str] = None,
+    cpu_threads: Optional[int] = None,
+    num_workers: int = 1,
 ) -> WhisperModel:
     if device == "auto":
-        # Prefer CUDA if available, else CPU
-        device = "cuda" if os.environ.get("CUDA_VISIBLE_DEVICES") not in (None, "") else "cpu"
+        # Prefer CUDA if a device is actually usable, else CPU
+        device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
     if compute_type is None:
         compute_type = "int8_float16" if device == "cuda" else "int8"
-    return WhisperModel(
-        model_size,
-        device=device,
-        compute_type=compute_type,
-        download_root=model_dir,
-    )
+    if cpu_threads is None:
+        # Give each worker its own share of the cores so concurrent transcriptions don't oversubscribe
+        cpu_threads = max(1, (os.cpu_count() or 1) // num_workers) if device == "cpu" else 0
+    # Reuse an already-loaded model for repeated calls in the same process
+    return _load_model_cached(model_size, device, compute_type, model_dir, cpu_threads, num_workers)
 
 
 def _should_mark_indistinct(text: str, avg_logprob: Optional[float], avg_word_prob: Optional[float]) -> bool:
@@ -61,18 +85,16 @@ def _should_mark_indistinct(text: str, avg_logprob: Optional[float], avg_word_pr
     return False
 
 
+def _emphasize_repl(m: re.Match[str]) -> str:
+    # The pattern guarantees the group is wrapped in [] or (), so drop one char on each side
+    return f" *{m.group(1)[1:-1].strip()}* "
+
+
 def _emphasize_bracketed(text: str) -> str:
     # Turn bracketed or parenthetical asides into *aside*
-    def repl(m: re.Match[str]) -> str:
-        inner = m.group(1)
-        inner = inner.strip()
-        if inner.startswith("[") and inner.endswith("]"):
-            inner = inner[1:-1].strip()
-        if inner.startswith("(") and inner.endswith(")"):
-            inner = inner[1:-1].strip()
-        return f" *{inner}* "
-
-    return _BRACKETED.sub(repl, text)
+    if "[" not in text and "(" not in text:
+        return text
+    return _BRACKETED.sub(_emphasize_repl, text)
 
 
 # Tighter VAD to avoid gluing across pauses
@@ -86,86 +108,103 @@ VAD_PARAMS = {
 SPLIT_GAP_SECONDS = 0.40
 
 
+def _segment_from_words(
+    seg, words: List[WordToken], start: float, avg_word_prob: Optional[float]
+) -> TranscriptSegment:
+    # Build one output segment from a run of words taken from a faster-whisper segment
+    raw_text = "".join(w.word for w in words).strip()
+    text = _emphasize_bracketed(raw_text)
+    if _should_mark_indistinct(raw_text, seg.avg_logprob, avg_word_prob):
+        text = f"*{text}*" if text else "*indistinct*"
+    return TranscriptSegment(
+        start=float(start),
+        end=float(words[-1].end),
+        text=text,
+        avg_logprob=seg.avg_logprob,
+        no_speech_prob=seg.no_speech_prob,
+        words=words,
+    )
+
+
 def transcribe_file(
     model: WhisperModel,
-    audio_path: str,
+    audio: Union[str, np.ndarray],
     language: Optional[str] = "en",
     beam_size: int = 5,
     vad_filter: bool = True,
+    batch_size: int = 8,
 ) -> List[TranscriptSegment]:
     segments: List[TranscriptSegment] = []
 
-    seg_iter, _info = model.transcribe(
-        audio_path,
-        beam_size=beam_size,
-        language=language,
-        vad_filter=vad_filter,
-        vad_parameters=VAD_PARAMS,
-        word_timestamps=True,
-    )
+    if batch_size > 1:
+        # Batch VAD chunks through the encoder/decoder. The pipeline keeps per-call state,
+        # so each call gets its own wrapper around the shared model.
+        seg_iter, _info = BatchedInferencePipeline(model=model).transcribe(
+            audio,
+            beam_size=beam_size,
+            language=language,
+            vad_filter=vad_filter,
+            vad_parameters=VAD_PARAMS,
+            word_timestamps=True,
+            batch_size=batch_size,
+        )
+    else:
+        seg_iter, _info = model.transcribe(
+            audio,
+            beam_size=beam_size,
+            language=language,
+            vad_filter=vad_filter,
+            vad_parameters=VAD_PARAMS,
+            word_timestamps=True,
+        )
 
+    append_segment = segments.append
     for seg in seg_iter:  # type: ignore
-        words = getattr(seg, "words", None)
+        words = seg.words
         if words:
+            seg_start = seg.start
             current_words: List[WordToken] = []
-            current_start: Optional[float] = None
-            prev_end: Optional[float] = None
-
-            def flush_from_words() -> None:
-                if not current_words:
-                    return
-                start_ts = current_start if current_start is not None else float(getattr(seg, "start", 0.0))
-                end_ts = float(current_words[-1].end if current_words[-1].end is not None else getattr(seg, "end", start_ts))
-                raw_text = "".join(w.word for w in current_words).strip()
-                text = _emphasize_bracketed(raw_text)
-                avg_word_prob = None
-                try:
-                    probs = [float(w.probability) for w in current_words if w.probability is not None]
-                    if probs:
-                        avg_word_prob = float(mean(probs))
-                except Exception:
-                    avg_word_prob = None
-                if _should_mark_indistinct(raw_text, getattr(seg, "avg_logprob", None), avg_word_prob):
-                    text = f"*{text}*" if text else "*indistinct*"
-                segments.append(
-                    TranscriptSegment(
-                        start=float(start_ts),
-                        end=float(end_ts),
-                        text=text,
-                        avg_logprob=getattr(seg, "avg_logprob", None),
-                        no_speech_prob=getattr(seg, "no_speech_prob", None),
-                        words=list(current_words),
-                    )
-                )
-                current_words.clear()
+            append_word = current_words.append
+            current_start = seg_start
+            prev_end = seg_start
+            prob_sum = 0.0
+            prob_n = 0
 
             for w in words:
-                wstart = float(getattr(w, "start", getattr(seg, "start", 0.0)) or 0.0)
-                wend = float(getattr(w, "end", wstart))
-                wtext = getattr(w, "word", "")
-                wprob = getattr(w, "probability", None)
-                if prev_end is not None and (wstart - prev_end) >= SPLIT_GAP_SECONDS:
-                    flush_from_words()
-                    current_start = wstart
+                wstart = w.start if w.start is not None else seg_start
+                wend = w.end if w.end is not None else wstart
+                wprob = w.probability
+                if current_words and (wstart - prev_end) >= SPLIT_GAP_SECONDS:
+                    avg_word_prob = prob_sum / prob_n if prob_n else None
+                    append_segment(_segment_from_words(seg, current_words, current_start, avg_word_prob))
+                    current_words = []
+                    append_word = current_words.append
+                    prob_sum = 0.0
+                    prob_n = 0
                 if not current_words:
                     current_start = wstart
-                current_words.append(WordToken(start=wstart, end=wend, word=wtext, probability=wprob))
+                append_word(WordToken(wstart, wend, w.word, wprob))
+                if wprob is not None:
+                    prob_sum += wprob
+                    prob_n += 1
                 prev_end = wend
 
-            flush_from_words()
+            if current_words:
+                avg_word_prob = prob_sum / prob_n if prob_n else None
+                append_segment(_segment_from_words(seg, current_words, current_start, avg_word_prob))
         else:
             # Fallback if no word timestamps are present
-            raw_text = (getattr(seg, "text", "") or "").strip()
+            raw_text = (seg.text or "").strip()
             text = _emphasize_bracketed(raw_text)
-            if _should_mark_indistinct(raw_text, getattr(seg, "avg_logprob", None), None):
+            if _should_mark_indistinct(raw_text, seg.avg_logprob, None):
                 text = f"*{text}*" if text else "*indistinct*"
-            segments.append(
+            append_segment(
                 TranscriptSegment(
-                    start=float(getattr(seg, "start", 0.0)),
-                    end=float(getattr(seg, "end", 0.0)),
+                    start=float(seg.start),
+                    end=float(seg.end),
                     text=text,
-                    avg_logprob=getattr(seg, "avg_logprob", None),
-                    no_speech_prob=getattr(seg, "no_speech_prob", None),
+                    avg_logprob=seg.avg_logprob,
+                    no_speech_prob=seg.no_speech_prob,
                     words=None,
                 )
             )
@@ -174,6 +213,9 @@ def transcribe_file(
     return [s for s in segments if s.text.strip()]
 
 
+_word_end = attrgetter("end")
+
+
 def _split_segment_at_time(segment: TranscriptSegment, boundary_time: float) -> List[TranscriptSegment]:
     if boundary_time <= segment.start or boundary_time >= segment.end:
         return [segment]
@@ -183,20 +225,23 @@ def _split_segment_at_time(segment: TranscriptSegment, boundary_time: float) ->
         right = replace(segment, start=boundary_time, text="")
         return [left, right]
 
-    left_words: List[WordToken] = []
+    # Word timings are monotonic, so a binary search on word ends finds the words wholly left of
+    # the boundary; only the few words after that which start before it straddle the boundary.
+    words = segment.words
+    n = len(words)
+    i = bisect_right(words, boundary_time, key=_word_end)
+    left_words: List[WordToken] = words[:i]
     right_words: List[WordToken] = []
-    for w in segment.words:
-        if w.end <= boundary_time:
-            left_words.append(w)
-        elif w.start >= boundary_time:
-            right_words.append(w)
+    while i < n and words[i].start < boundary_time:
+        # Word straddles boundary: assign by midpoint
+        w = words[i]
+        mid = (w.start + w.end) / 2.0
+        if mid <= boundary_time:
+            left_words.append(WordToken(start=w.start, end=boundary_time, word=w.word, probability=w.probability))
         else:
-            # Word straddles boundary: assign by midpoint
-            mid = (w.start + w.end) / 2.0
-            if mid <= boundary_time:
-                left_words.append(WordToken(start=w.start, end=boundary_time, word=w.word, probability=w.probability))
-            else:
-                right_words.append(WordToken(start=boundary_time, end=w.end, word=w.word, probability=w.probability))
+            right_words.append(WordToken(start=boundary_time, end=w.end, word=w.word, probability=w.probability))
+        i += 1
+    right_words.extend(words[i:])
 
     parts: List[TranscriptSegment] = []
     if left_words:
@@ -237,13 +282,16 @@ def _split_segments_at_boundaries(segments: List[TranscriptSegment], boundaries:
     boundaries = sorted(boundaries)
     result: List[TranscriptSegment] = []
     for seg in segments:
-        stack = [seg]
-        for b in boundaries:
-            new_stack: List[TranscriptSegment] = []
-            for part in stack:
-                new_stack.extend(_split_segment_at_time(part, b))
-            stack = new_stack
-        result.extend(stack)
+        # Only boundaries strictly inside the segment can split it
+        lo = bisect_right(boundaries, seg.start)
+        hi = bisect_left(boundaries, seg.end, lo)
+        tail = seg
+        for b in boundaries[lo:hi]:
+            # Earlier pieces end at or before b, so only the trailing piece can still be split
+            parts = _split_segment_at_time(tail, b)
+            result.extend(parts[:-1])
+            tail = parts[-1]
+        result.append(tail)
     # Drop empty-text parts if any
     return [s for s in result if s.text.strip()]
 
@@ -254,8 +302,15 @@ def merge_dialogue(
     right_segments: Iterable[TranscriptSegment],
     right_speaker: str,
 ) -> List[TranscriptSegment]:
-    left_list = [replace(s, speaker=left_speaker) for s in left_segments]
-    right_list = [replace(s, speaker=right_speaker) for s in right_segments]
+    # Segments come straight from transcribe_file and aren't shared, so label them in place
+    left_list: List[TranscriptSegment] = []
+    for s in left_segments:
+        s.speaker = left_speaker
+        left_list.append(s)
+    right_list: List[TranscriptSegment] = []
+    for s in right_segments:
+        s.speaker = right_speaker
+        right_list.append(s)
 
     # Cross-split at each other's start times to avoid gluing text across speaker turns
     left_boundaries = [s.start for s in right_list]
@@ -269,5 +324,5 @@ def merge_dialogue(
     merged.extend(right_list)
 
     # Sort by start time, then end time for stability
-    merged.sort(key=lambda s: (s.start, s.end))
+    merged.sort(key=attrgetter("start", "end"))
     return merged